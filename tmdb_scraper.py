@@ -1,8 +1,14 @@
 import os
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from dotenv import load_dotenv
+from urllib.parse import urlencode
 import sys
 load_dotenv()
 
@@ -18,15 +24,43 @@ BASE_URL = "https://api.themoviedb.org/3"
 DISCOVER_ENDPOINT = f"{BASE_URL}/discover/movie"
 GENRE_ENDPOINT = f"{BASE_URL}/genre/movie/list"
 
+# One keep-alive session for the whole run so the TLS handshake to
+# api.themoviedb.org happens once instead of on every page. Set
+# TMDB_USE_CACHE=true to cache responses on disk for 24h, which makes
+# reruns during development near-instant (requires requests-cache).
+if os.getenv("TMDB_USE_CACHE", "").lower() in ("1", "true", "yes"):
+    try:
+        from requests_cache import CachedSession
+        session = CachedSession(".tmdb_cache", expire_after=86400)
+    except ImportError:
+        print("Warning: TMDB_USE_CACHE is set but requests-cache is not installed.")
+        print("Install it with: pip install requests-cache. Continuing without cache.")
+        session = requests.Session()
+else:
+    session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    # Retry transient server/connection errors with exponential backoff;
+    # 429 stays out of the list so the Retry-After handling in main applies
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504]),
+))
+session.headers["Accept-Encoding"] = "gzip"
+
 def get_genres():
     url = GENRE_ENDPOINT
     params = {"api_key": API_KEY, "language": "en-US"}
     
     try:
-        response = requests.get(url, params=params)
+        response = session.get(url, params=params)
         response.raise_for_status()
-        genres_list = response.json().get("genres", [])
-        return {genre["id"]: genre["name"] for genre in genres_list}
+        genres_list = orjson.loads(response.content).get("genres", [])
+        # TMDb genre ids are small ints, so a flat list indexed by id is a
+        # cheaper lookup than a dict in the per-movie loop
+        lut = [""] * (max((genre["id"] for genre in genres_list), default=-1) + 1)
+        for genre in genres_list:
+            lut[genre["id"]] = genre["name"]
+        return lut
     
     except requests.exceptions.HTTPError as e:
         if response.status_code == 401:
@@ -44,39 +78,55 @@ def get_genres():
         print(f"Unexpected error while fetching genres: {e}")
         sys.exit(1)
 
+def page_delay(response, default=0.25):
+    """Pace the next request from TMDb's rate-limit headers when present."""
+    try:
+        remaining = int(response.headers["X-RateLimit-Remaining"])
+        reset = int(response.headers["X-RateLimit-Reset"])
+    except (KeyError, ValueError):
+        return default
+    window = reset - time.time()
+    if remaining <= 0:
+        return max(0.0, window)
+    return max(0.0, window / remaining)
+
 def main():
     try:
-        genres_map = get_genres()
+        genre_lut = get_genres()
     except SystemExit:
         return  # Exit gracefully if genre fetching failed
 
     titles = []
-    years = []
+    release_dates = []
     ratings = []
-    descriptions = []
+    overviews = []
     genres = []
 
     per_page = 20
     target_movies = 10000
     max_pages = 500  # TMDb limit
     movies_fetched = 0
+    progress_interval = 0.1  # seconds between progress repaints
+    last_progress = 0.0
 
     print(f"TMDb Movie Scraper\nCopyright © 2025 Herald Inyang\n")
     print(f"Fetching up to {target_movies} movies across {max_pages} pages.\nPlease wait...")
 
+    # Percent-encode the static part of the query once; only the page number
+    # changes between requests
+    base_query = urlencode({
+        "api_key": API_KEY,
+        "sort_by": "popularity.desc",
+        "include_adult": "true",
+        "language": "en-US",
+    })
+    discover_url = f"{DISCOVER_ENDPOINT}?{base_query}"
+
     for page in range(1, max_pages + 1):
-        params = {
-            "api_key": API_KEY,
-            "page": page,
-            "sort_by": "popularity.desc",
-            "include_adult": "true",
-            "language": "en-US",
-        }
-        
         try:
-            response = requests.get(DISCOVER_ENDPOINT, params=params)
+            response = session.get(f"{discover_url}&page={page}")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
         
         except requests.exceptions.HTTPError as e:
             if response.status_code == 401:
@@ -84,8 +134,10 @@ def main():
                 print("You can get an API key from: https://www.themoviedb.org/settings/api")
                 break
             elif response.status_code == 429:
-                print(f"\nRate limit exceeded. Waiting 10 seconds before retrying...")
-                time.sleep(10)
+                retry_after = response.headers.get("Retry-After", "")
+                wait = int(retry_after) if retry_after.isdigit() else 10
+                print(f"\nRate limit exceeded. Waiting {wait} seconds before retrying...")
+                time.sleep(wait)
                 continue
             else:
                 print(f"\nHTTP Error {response.status_code} on page {page}: {e}")
@@ -111,35 +163,41 @@ def main():
             if movies_fetched >= target_movies:
                 break
                 
-            titles.append(movie.get("title", ""))
-            release_date = movie.get("release_date", "")
-            year = release_date.split("-")[0] if release_date else ""
-            years.append(year)
-            ratings.append(movie.get("vote_average", 0))
-            descriptions.append((movie.get("overview") or "").replace("\n", " ").strip())
-            genre_names = [genres_map.get(gid, "") for gid in movie.get("genre_ids", [])]
+            get = movie.get  # bind once; saves an attribute lookup per field
+            titles.append(get("title", ""))
+            # raw values only here; Year/Description are derived in bulk below
+            release_dates.append(get("release_date", "") or "")
+            ratings.append(get("vote_average", 0))
+            overviews.append(get("overview") or "")
+            genre_names = [genre_lut[gid] for gid in get("genre_ids", []) if gid < len(genre_lut)]
             genres.append(", ".join(filter(None, genre_names)))
 
             movies_fetched += 1
 
-        # Calculate and print percentage
-        percentage_complete = (page / max_pages) * 100
-        print(f"\r{percentage_complete:.2f}% complete", end="", flush=True)
+        # Repaint progress at most every progress_interval seconds so fast
+        # pages don't flood the terminal and slow ones still update promptly
+        now = time.monotonic()
+        if now - last_progress >= progress_interval:
+            last_progress = now
+            percentage_complete = (page / max_pages) * 100
+            print(f"\r{percentage_complete:.2f}% complete", end="", flush=True)
 
         if movies_fetched >= target_movies:
             print(f"\nReached target of {target_movies} movies.")
             break
-        time.sleep(0.25)
+        time.sleep(page_delay(response))
 
     if movies_fetched == 0:
         print("No movies were fetched. Please check your API key and internet connection.")
         return
 
+    # Derive Year/Description once over the whole column with pandas' C str
+    # kernels instead of per-movie Python string calls in the loop
     df = pd.DataFrame({
         "Title": titles,
-        "Year": years,
+        "Year": pd.Series(release_dates).str.slice(0, 4),  # dates are YYYY-MM-DD
         "Rating": ratings,
-        "Description": descriptions,
+        "Description": pd.Series(overviews).str.replace("\n", " ", regex=False).str.strip(),
         "Genre": genres,
     })
 
@@ -150,7 +208,12 @@ def main():
         print(f"\n⚠️ NOTE: {skipped:,} movie{plural} skipped due to API limits.\n")    
     
     try:
-        df.to_csv("tmdb_movies.csv", index=False)
+        # PyArrow's CSV writer is native and much faster than pandas' row-by-row
+        # formatter; fall back to pandas if a column dtype trips it up.
+        try:
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), "tmdb_movies.csv")
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            df.to_csv("tmdb_movies.csv", index=False)
         print("Saved data to tmdb_movies.csv")
     except Exception as e:
         print(f"Error saving CSV file: {e}")